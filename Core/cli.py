@@ -5,11 +5,13 @@ import json
 from pathlib import Path
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any
 
 try:
     from .extractor import ExtractorPDF
     from .nlp_model import AnalizadorNLP
+    from .salida import escribir_excel
 except ImportError as import_err:
     print(f"❌ Error de importación: {str(import_err)}. Ejecuta como módulo: python -m Core.cli procesar ...")
     sys.exit(1)
@@ -55,52 +57,64 @@ def procesar(
     logger = _configurar_logging()
     typer.secho(f"\n🚀 Iniciando proceso para: [bold cyan]{archivo_pdf.name}[/bold cyan]", bold=True)
 
-    try:
-        # Extracción de datos
-        extractor = ExtractorPDF()
-        paginas = (inicio, fin if fin > 0 else 9999)
+    # El modelo spaCy se carga en segundo plano mientras se extrae el PDF
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        futuro_analizador = pool.submit(AnalizadorNLP)
+
+        try:
+            # Extracción de datos
+            extractor = ExtractorPDF()
+            paginas = (inicio, fin if fin > 0 else 9999)
         
-        df_presupuesto, df_descripciones = extractor.extraer_datos_pdf(str(archivo_pdf), paginas)
+            df_presupuesto, df_descripciones = extractor.extraer_datos_pdf(str(archivo_pdf), paginas)
         
-        # Guardado en Excel
-        with pd.ExcelWriter(output_excel, engine='xlsxwriter') as writer:
-            df_presupuesto.to_excel(writer, sheet_name='PRESUPUESTO', index=False)
-            df_descripciones.to_excel(writer, sheet_name='DESCRIPCIONES_COMPLETAS', index=False)
-        typer.secho(f"\n✅ Datos guardados en: [bold green]{output_excel.resolve()}[/bold green]")
+            # Pocas unidades distintas repetidas en miles de filas
+            df_presupuesto['UNIDAD'] = df_presupuesto['UNIDAD'].astype('category')
+
+            # Guardado en Excel
+            escribir_excel(output_excel, {
+                'PRESUPUESTO': df_presupuesto,
+                'DESCRIPCIONES_COMPLETAS': df_descripciones
+            })
+            typer.secho(f"\n✅ Datos guardados en: [bold green]{output_excel.resolve()}[/bold green]")
 
-        # Análisis NLP
-        typer.echo("\n🔍 Analizando descripciones con NLP...")
-        datos_nlp = {
-            "partidas": [
-                {
-                    "codigo": str(item.get("codigo", "")),
-                    "descripcion": str(item.get("descripcion", ""))
-                }
-                for item in df_descripciones.rename(
-                    columns={'CÓDIGO': 'codigo', 'DESCRIPCIÓN_COMPLETA': 'descripcion'}
-                ).to_dict('records')
-            ]
-        }
+            # Análisis NLP
+            typer.echo("\n🔍 Analizando descripciones con NLP...")
+            textos = df_descripciones[["CÓDIGO", "DESCRIPCIÓN_COMPLETA"]].fillna("").astype(str)
+            datos_nlp = {
+                "partidas": [
+                    {"codigo": codigo, "descripcion": descripcion}
+                    for codigo, descripcion in zip(
+                        textos["CÓDIGO"].tolist(),
+                        textos["DESCRIPCIÓN_COMPLETA"].tolist()
+                    )
+                ]
+            }
         
-        analizador = AnalizadorNLP()
-        resultados_nlp = analizador.analizar(datos_nlp)
+            analizador = futuro_analizador.result()
+            resultados_nlp = analizador.analizar(datos_nlp)
 
-        # Guardado JSON
-        with open(output_analisis, 'w', encoding='utf-8') as f:
-            json.dump(resultados_nlp, f, indent=2, ensure_ascii=False)
-        typer.secho(f"✅ Análisis guardado en: [bold green]{output_analisis.resolve()}[/bold green]")
+            # Guardado JSON
+            with open(output_analisis, 'w', encoding='utf-8') as f:
+                json.dump(resultados_nlp, f, indent=2, ensure_ascii=False)
+            typer.secho(f"✅ Análisis guardado en: [bold green]{output_analisis.resolve()}[/bold green]")
 
-        # Mostrar resumen
-        _mostrar_alertas(resultados_nlp)
+            # Mostrar resumen
+            _mostrar_alertas(resultados_nlp)
 
-    except Exception as e:
-        logger.exception(f"Error durante el procesamiento: {str(e)}")
-        typer.secho(
-            f"\n💥 ERROR: {str(e)}. Revisa 'ejecucion.log' para detalles completos.",
-            fg=typer.colors.BRIGHT_RED,
-            bold=True
-        )
-        raise typer.Exit(code=1) from e
+        except Exception as e:
+            logger.exception(f"Error durante el procesamiento: {str(e)}")
+            # Una carga aún no iniciada se cancela; si está en curso, el with espera a que termine
+            if not futuro_analizador.cancel():
+                error_carga = futuro_analizador.exception()
+                if error_carga is not None and error_carga is not e:
+                    logger.error(f"También falló la carga del modelo NLP: {str(error_carga)}")
+            typer.secho(
+                f"\n💥 ERROR: {str(e)}. Revisa 'ejecucion.log' para detalles completos.",
+                fg=typer.colors.BRIGHT_RED,
+                bold=True
+            )
+            raise typer.Exit(code=1) from e
 
 if __name__ == "__main__":
     app()
@@ -1,34 +1,53 @@
 # Core/extractor.py
 import re
 import pandas as pd
-from typing import Tuple, Dict, Optional
+from typing import Tuple, Dict, Iterator, List, Optional
 from pathlib import Path
-import pdfplumber
-import locale
+import fitz
 import logging
 
+# Línea de partida: código, descripción, unidad, cantidad, precio e importe
+_PATRON_LINEA = re.compile(
+    r"^(\d{2,3}\.\d{2}\.\d{2})\s+(.+?)\s+([A-Z]{2,4})\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)$"
+)
+_COLUMNAS_PARTIDA = [
+    "CÓDIGO",
+    "DESCRIPCIÓN",
+    "UNIDAD",
+    "CANTIDAD",
+    "PRECIO_UNITARIO",
+    "IMPORTE_TOTAL",
+]
+_COLUMNAS_NUMERICAS = ["CANTIDAD", "PRECIO_UNITARIO", "IMPORTE_TOTAL"]
+# Formato español: se eliminan los puntos de miles y la coma pasa a punto
+_TRANS_NUMERO = str.maketrans({".": "", ",": "."})
+# Diferencia máxima (en puntos) entre bases de palabras de una misma línea visual
+_TOLERANCIA_LINEA = 3.0
+
 
 class ExtractorPDF:
     def __init__(self):
-        # Configurar locale para interpretación numérica
-        locale.setlocale(locale.LC_ALL, "es_ES.UTF-8")
         self.logger = logging.getLogger(__name__)
 
     def _limpiar_y_convertir_numeros(self, valor: str) -> float:
         """Limpia y convierte strings numéricos con formato español"""
-        try:
-            if not valor or not isinstance(valor, str):
-                return 0.0
+        if not valor or not isinstance(valor, str):
+            return 0.0
 
-            # Eliminar puntos de miles y cambiar comas por puntos
-            valor_limpio = valor.replace(".", "").replace(",", ".")
-            return locale.atof(valor_limpio)
-        except (ValueError, AttributeError) as e:
+        try:
+            return float(valor.translate(_TRANS_NUMERO))
+        except ValueError as e:
             self.logger.warning(
                 f"No se pudo convertir el valor numérico: {valor}. Error: {str(e)}"
             )
             return 0.0
 
+    def _convertir_serie_numerica(self, serie: pd.Series) -> pd.Series:
+        """Versión vectorizada de _limpiar_y_convertir_numeros para una columna entera"""
+        valores = serie.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+        # Siempre float64: sin coma decimal to_numeric devolvería int64
+        return pd.to_numeric(valores, errors="coerce").fillna(0.0).astype("float64")
+
     def _procesar_linea(self, linea: str) -> Optional[Dict[str, object]]:
         """
         Procesa una línea de texto del PDF y extrae los campos
@@ -40,9 +59,13 @@ class ExtractorPDF:
         Returns:
             Optional[Dict[str, object]]: Diccionario con los campos extraídos o None
         """
-        # Expresión regular mejorada con manejo de espacios variables
-        patron = r"^(\d{2,3}\.\d{2}\.\d{2})\s+(.+?)\s+([A-Z]{2,4})\s+([\d\.,]+)\s+([\d\.,]+)\s+([\d\.,]+)$"
-        match = re.search(patron, linea.strip())
+        linea = linea.strip()
+        # Descarta cabeceras y líneas vacías sin pasar por la expresión regular
+        if not linea or not linea[0].isdigit():
+            return None
+
+        # El patrón está anclado, así que match evita el barrido de search
+        match = _PATRON_LINEA.match(linea)
 
         if not match:
             return None
@@ -60,6 +83,28 @@ class ExtractorPDF:
             self.logger.error(f"Error procesando línea: {linea}. Error: {str(e)}")
             return None
 
+    def _extraer_partidas(self, lineas: List[str]) -> pd.DataFrame:
+        """
+        Aplica el patrón de partida a todas las líneas en bloque
+
+        Args:
+            lineas (List[str]): Líneas de texto del PDF
+
+        Returns:
+            pd.DataFrame: Una fila por línea que coincide con el patrón
+        """
+        lineas_limpias = pd.Series(lineas, dtype=str).str.strip()
+
+        partidas = lineas_limpias.str.extract(_PATRON_LINEA)
+        partidas = partidas.dropna().reset_index(drop=True)
+        partidas.columns = _COLUMNAS_PARTIDA
+        partidas["DESCRIPCIÓN"] = partidas["DESCRIPCIÓN"].str.strip()
+
+        for col in _COLUMNAS_NUMERICAS:
+            partidas[col] = self._convertir_serie_numerica(partidas[col])
+
+        return partidas
+
     def _validar_datos(self, df: pd.DataFrame) -> pd.DataFrame:
         """Valida y ajusta los tipos de datos numéricos"""
         if df.empty:
@@ -74,48 +119,91 @@ class ExtractorPDF:
 
         return df
 
+    def _texto_pagina(self, pagina: fitz.Page) -> str:
+        """
+        Reconstruye las líneas visuales de la página a partir de sus palabras
+
+        get_text("text") devuelve cada bloque de texto en su propia línea, de modo
+        que las columnas de una tabla (código, descripción, unidad, importes...)
+        quedan separadas. Aquí se agrupan las palabras por su línea base y se
+        ordenan por su posición horizontal, como hacía pdfplumber.
+
+        Args:
+            pagina (fitz.Page): Página del documento
+
+        Returns:
+            str: Texto de la página con una línea visual por renglón
+        """
+        # Tuplas (x0, y0, x1, y1, palabra, bloque, línea, número de palabra)
+        palabras = sorted(pagina.get_text("words"), key=lambda w: (w[3], w[0]))
+
+        renglones = []
+        base = None
+        for palabra in palabras:
+            if base is None or abs(palabra[3] - base) > _TOLERANCIA_LINEA:
+                renglones.append([])
+                base = palabra[3]
+            renglones[-1].append(palabra)
+
+        return "\n".join(
+            " ".join(w[4] for w in sorted(renglon, key=lambda w: w[0]))
+            for renglon in renglones
+        )
+
+    def _iter_texto_rango(
+        self, doc: fitz.Document, paginas: Tuple[int, int]
+    ) -> Iterator[str]:
+        """
+        Recorre el rango de páginas y devuelve el texto de cada una por separado
+
+        Args:
+            doc (fitz.Document): Documento PDF abierto
+            paginas (Tuple[int, int]): Página inicial y final (0 para hasta el final)
+
+        Yields:
+            str: Texto de cada página no vacía
+        """
+        start, end = paginas
+        ultima = min(end, doc.page_count) if end > 0 else doc.page_count
+
+        for page_num in range(start - 1, ultima):
+            texto = self._texto_pagina(doc[page_num])
+            if texto:
+                yield texto
+
+    def contar_paginas(self, pdf_path: str) -> int:
+        """Devuelve el número de páginas del PDF"""
+        with fitz.open(pdf_path) as doc:
+            return doc.page_count
+
     def extraer_datos_pdf(
         self, pdf_path: str, paginas: Tuple[int, int]
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """Método principal de extracción mejorado"""
-        datos_presupuesto = []
-        datos_descripciones = []
+        lineas = []
 
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                start, end = paginas
-                paginas_a_procesar = (
-                    pdf.pages[start - 1 : end] if end > 0 else pdf.pages[start - 1 :]
-                )
-
-                for pagina in paginas_a_procesar:
-                    texto = pagina.extract_text()
-                    if not texto:
-                        continue
-
-                    for linea in texto.split("\n"):
-                        datos = self._procesar_linea(linea)
-                        if datos:
-                            datos_presupuesto.append(datos)
-
-                            # Crear registro para NLP
-                            datos_descripciones.append(
-                                {
-                                    "CÓDIGO": datos["CÓDIGO"],
-                                    "DESCRIPCIÓN_COMPLETA": f"{datos['CÓDIGO']} {datos['DESCRIPCIÓN']}",
-                                    "UNIDAD": datos["UNIDAD"],
-                                }
-                            )
+            with fitz.open(pdf_path) as doc:
+                for texto in self._iter_texto_rango(doc, paginas):
+                    # De cada página solo se guardan las líneas que pueden ser partidas
+                    lineas.extend(
+                        linea for linea in texto.split("\n") if linea[:1].isdigit()
+                    )
         except Exception as e:
             self.logger.error(f"Error al procesar PDF: {str(e)}")
             raise
 
-        # Crear DataFrames y validar datos
-        df_presupuesto = (
-            pd.DataFrame(datos_presupuesto) if datos_presupuesto else pd.DataFrame()
-        )
-        df_descripciones = (
-            pd.DataFrame(datos_descripciones) if datos_descripciones else pd.DataFrame()
+        df_presupuesto = self._extraer_partidas(lineas)
+
+        # Crear registros para NLP
+        df_descripciones = pd.DataFrame(
+            {
+                "CÓDIGO": df_presupuesto["CÓDIGO"],
+                "DESCRIPCIÓN_COMPLETA": df_presupuesto["CÓDIGO"]
+                + " "
+                + df_presupuesto["DESCRIPCIÓN"],
+                "UNIDAD": df_presupuesto["UNIDAD"],
+            }
         )
 
         if not df_presupuesto.empty:
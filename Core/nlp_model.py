@@ -1,21 +1,36 @@
 # Core/nlp_model.py
+import os
 import re
+import functools
 from collections import defaultdict
 from typing import Dict, List, Union, Optional, Set
 import spacy
 from spacy.language import Language
 from spacy.pipeline import EntityRuler
+from spacy.matcher import Matcher
 import logging
 
+# Solo se usan doc.ents (NER + EntityRuler); el resto del pipeline se desactiva.
+# Los docs resultantes no tienen POS, lemas ni dependencias.
+_COMPONENTES_NO_USADOS = ("tagger", "morphologizer", "parser", "attribute_ruler", "lemmatizer")
+
+@functools.lru_cache(maxsize=4)
+def _cargar_modelo(nombre: str, desactivar: tuple = ()) -> Language:
+    """Carga un modelo spaCy una sola vez por proceso y lo comparte entre instancias."""
+    return spacy.load(nombre, disable=list(desactivar))
+
 class AnalizadorNLP:
     """
     Analizador de presupuestos que utiliza spaCy para extraer entidades
     y validar contenido técnico de forma robusta.
     """
+    # Tamaño de lote para nlp.pipe; la variable de entorno NLP_BATCH_SIZE lo sustituye
+    BATCH_SIZE = 64
+
     def __init__(self, nlp: Optional[Language] = None):
         self.logger = logging.getLogger(__name__)
         try:
-            self.nlp = nlp if nlp else spacy.load("es_core_news_sm")
+            self.nlp = nlp if nlp else _cargar_modelo("es_core_news_sm", _COMPONENTES_NO_USADOS)
             self._configurar_entity_ruler()
             self.logger.info("Pipeline NLP inicializado correctamente")
         except IOError as e:
@@ -27,10 +42,11 @@ class AnalizadorNLP:
 
     def _configurar_entity_ruler(self) -> None:
         """Configura el EntityRuler con patrones técnicos para presupuestos."""
+        # El id guarda la forma normalizada, que luego se lee de ent.ent_id_
         patrones = [
-            {"label": "MATERIAL", "pattern": term} for term in ["cable", "bornas", "contactor", "protección"]
+            {"label": "MATERIAL", "pattern": term, "id": term.lower()} for term in ["cable", "bornas", "contactor", "protección"]
         ] + [
-            {"label": "NORMATIVA", "pattern": term} for term in ["REBT", "IEC", "UNE-EN"]
+            {"label": "NORMATIVA", "pattern": term, "id": term.upper()} for term in ["REBT", "IEC", "UNE-EN"]
         ] + [
             {"label": "PARAMETRO", "pattern": [{"TEXT": {"REGEX": r"\d+x\d+[aA]"}}]}
         ]
@@ -41,7 +57,27 @@ class AnalizadorNLP:
             ruler.add_patterns(patrones)  # type: ignore
         else:
             existing_ruler = self.nlp.get_pipe(ruler_name)
-            existing_ruler.add_patterns(patrones)  # type: ignore
+            # El modelo puede venir de la caché compartida: no duplicar patrones
+            nuevos = [p for p in patrones if p not in existing_ruler.patterns]  # type: ignore
+            existing_ruler.add_patterns(nuevos)  # type: ignore
+
+        # Menciones de contactor (también en plural), evaluadas sobre los tokens
+        self._matcher = Matcher(self.nlp.vocab)
+        self._matcher.add("CONTACTOR", [[{"LOWER": {"REGEX": "contactor"}}]])
+
+    def _tamano_lote(self) -> int:
+        """Lee NLP_BATCH_SIZE en cada análisis; si no es un entero positivo usa BATCH_SIZE."""
+        valor = os.getenv("NLP_BATCH_SIZE")
+        if valor is None:
+            return self.BATCH_SIZE
+        try:
+            tamano = int(valor)
+        except ValueError:
+            tamano = 0
+        if tamano < 1:
+            self.logger.warning(f"NLP_BATCH_SIZE inválido ({valor!r}); se usa {self.BATCH_SIZE}")
+            return self.BATCH_SIZE
+        return tamano
 
     def analizar(self, datos: Dict[str, List[Dict[str, str]]]) -> Dict[str, Union[Dict[str, int], List[str], List[Dict[str, str]]]]:
         """
@@ -76,6 +112,8 @@ class AnalizadorNLP:
             "alertas_tecnicas": []
         }
         
+        codigos = []
+        textos = []
         for partida in datos["partidas"]:
             if not isinstance(partida, dict):
                 self.logger.warning(f"Partida ignorada: formato incorrecto {partida}")
@@ -87,14 +125,29 @@ class AnalizadorNLP:
             if not descripcion:
                 self.logger.debug(f"Partida {codigo} sin descripción")
                 continue
-                
-            try:
-                doc = self.nlp(descripcion)
-                self._procesar_entidades(doc, resultados, codigo, descripcion)
-                
-            except Exception as e:
-                self.logger.error(f"Error procesando partida {codigo}: {str(e)}", exc_info=True)
-                continue
+
+            codigos.append(codigo)
+            textos.append(descripcion)
+
+        # nlp.pipe procesa las descripciones por lotes en lugar de una a una
+        procesadas = 0
+        try:
+            for codigo, doc in zip(codigos, self.nlp.pipe(textos, batch_size=self._tamano_lote())):
+                procesadas += 1
+                try:
+                    self._procesar_entidades(doc, resultados, codigo)
+
+                except Exception as e:
+                    self.logger.error(f"Error procesando partida {codigo}: {str(e)}", exc_info=True)
+                    continue
+        except Exception as e:
+            # Un fallo dentro de nlp.pipe corta todo el generador: el resto se procesa de una en una
+            self.logger.error(f"Error en el procesado por lotes tras {procesadas} partidas: {str(e)}", exc_info=True)
+            for codigo, texto in zip(codigos[procesadas:], textos[procesadas:]):
+                try:
+                    self._procesar_entidades(self.nlp(texto), resultados, codigo)
+                except Exception as e:
+                    self.logger.error(f"Error procesando partida {codigo}: {str(e)}", exc_info=True)
 
         return {
             "conteo_materiales": dict(resultados["conteo_materiales"]),
@@ -102,16 +155,19 @@ class AnalizadorNLP:
             "alertas_tecnicas": resultados["alertas_tecnicas"]
         }
 
-    def _procesar_entidades(self, doc, resultados: Dict, codigo: str, descripcion: str) -> None:
+    def _procesar_entidades(self, doc, resultados: Dict, codigo: str) -> None:
         """Procesamiento centralizado de entidades NLP"""
+        tiene_parametro = False
         for ent in doc.ents:
             if ent.label_ == "MATERIAL":
-                resultados["conteo_materiales"][ent.text.lower()] += 1
+                resultados["conteo_materiales"][ent.ent_id_ or ent.text.lower()] += 1
             elif ent.label_ == "NORMATIVA":
-                resultados["normativas_encontradas"].add(ent.text.upper())
+                resultados["normativas_encontradas"].add(ent.ent_id_ or ent.text.upper())
+            elif ent.label_ == "PARAMETRO":
+                tiene_parametro = True
         
         # Detección específica para contactores sin parámetros
-        if "contactor" in descripcion.lower() and not any(ent.label_ == "PARAMETRO" for ent in doc.ents):
+        if not tiene_parametro and self._matcher(doc):
             resultados["alertas_tecnicas"].append({
                 "código": codigo,
                 "mensaje": "Se menciona 'contactor' sin parámetro técnico (ej: 4x25A)."
@@ -0,0 +1,22 @@
+# Core/salida.py
+from pathlib import Path
+from typing import Dict
+import pandas as pd
+import xlsxwriter
+
+def escribir_excel(ruta: Path, hojas: Dict[str, pd.DataFrame]) -> None:
+    """
+    Escribe cada DataFrame en su hoja fila a fila con xlsxwriter en modo constant_memory.
+
+    to_excel rellena las celdas columna a columna, incompatible con constant_memory
+    (que descarta cada fila al empezar la siguiente), por eso se escribe directamente.
+    """
+    workbook = xlsxwriter.Workbook(str(ruta), {'constant_memory': True, 'strings_to_urls': False})
+    try:
+        for nombre, df in hojas.items():
+            worksheet = workbook.add_worksheet(nombre)
+            worksheet.write_row(0, 0, list(df.columns))
+            for num_fila, fila in enumerate(df.itertuples(index=False, name=None), start=1):
+                worksheet.write_row(num_fila, 0, fila)
+    finally:
+        workbook.close()
@@ -3,13 +3,21 @@
 Punto de entrada principal y orquestador del proyecto.
 Resuelve problemas de importación y coordina la extracción y análisis.
 """
+import os
 import sys
+import functools
 from pathlib import Path
 import argparse
 import json
 import pandas as pd
 import logging
-from typing import Dict, List, Any, cast
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Any, Tuple, cast
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- CONFIGURACIÓN DE RUTA PROFESIONAL ---
 try:
@@ -18,87 +26,204 @@ try:
     
     from Core.extractor import ExtractorPDF
     from Core.nlp_model import AnalizadorNLP
+    from Core.salida import escribir_excel
 except ImportError as e:
     print(f"❌ Error de importación. Asegúrate de que la estructura es correcta: main.py y la carpeta Core/ al mismo nivel.")
     print(f"Error original: {e}")
     sys.exit(1)
 
 # --- CONFIGURACIÓN DE LOGGING ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("ejecucion_main.log", mode='w', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+def _configurar_logging() -> None:
+    """Configura el logging de la ejecución; solo se llama al lanzar el script."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("ejecucion_main.log", mode='w', encoding='utf-8', delay=True),
+            logging.StreamHandler()
+        ]
+    )
+
 logger = logging.getLogger(__name__)
 
+_TAMANO_BLOQUE_ESCRITURA = 16 * 1024 * 1024
+
 def convertir_a_formato_nlp(df: pd.DataFrame) -> Dict[str, List[Dict[str, str]]]:
     """Convierte el DataFrame al formato estricto que espera el AnalizadorNLP."""
-    registros = df.rename(
-        columns={'CÓDIGO': 'codigo', 'DESCRIPCIÓN_COMPLETA': 'descripcion'}
-    ).to_dict('records')
+    # Conversión de tipos vectorizada: StringDtype y vacíos en lugar de nulos
+    sub = df[['CÓDIGO', 'DESCRIPCIÓN_COMPLETA']].astype(
+        {'CÓDIGO': 'string', 'DESCRIPCIÓN_COMPLETA': 'string'}
+    ).fillna('')
+    sub.columns = ['codigo', 'descripcion']
     
-    # Conversión de tipos explícita
-    partidas = [
-        {
-            'codigo': str(item.get('codigo', '')),
-            'descripcion': str(item.get('descripcion', ''))
-        }
-        for item in registros
-    ]
-    
-    return {'partidas': partidas}
+    return {'partidas': sub.to_dict(orient='records')}
+
+@functools.lru_cache(maxsize=1)
+def _get_extractor() -> ExtractorPDF:
+    """Instancia única de ExtractorPDF por proceso."""
+    return ExtractorPDF()
+
+@functools.lru_cache(maxsize=1)
+def _get_analizador() -> AnalizadorNLP:
+    """Instancia única de AnalizadorNLP por proceso, para no repetir la carga del modelo."""
+    return AnalizadorNLP()
+
+def _extraer_rango(pdf_path: str, paginas: Tuple[int, int]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Extrae un tramo de páginas; se ejecuta en un proceso trabajador."""
+    return _get_extractor().extraer_datos_pdf(pdf_path, paginas)
+
+def _dividir_rango(inicio: int, fin: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Divide las páginas inicio..fin (ambas incluidas) en tramos contiguos, uno por proceso.
+
+    Nunca hay más tramos que páginas; con un rango vacío se devuelve un único tramo
+    que no contiene ninguna página.
+    """
+    num_paginas = fin - inicio + 1
+    workers = max(1, min(workers, num_paginas))
+
+    tamano, resto = divmod(max(num_paginas, 0), workers)
+    tramos = []
+    primera = inicio
+    for i in range(workers):
+        ultima = primera + tamano + (1 if i < resto else 0) - 1
+        tramos.append((primera, ultima))
+        primera = ultima + 1
+    return tramos
+
+def extraer_en_paralelo(
+    extractor: ExtractorPDF, pdf_path: str, paginas: Tuple[int, int], workers: int
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Reparte el rango de páginas en tramos contiguos y los extrae en procesos separados.
+
+    Cada línea de partida está contenida en una página, así que los tramos son
+    independientes y se concatenan en el orden original.
+    """
+    inicio, fin = paginas
+    fin = min(fin, extractor.contar_paginas(pdf_path))
+    tramos = _dividir_rango(inicio, fin, workers)
+
+    if len(tramos) == 1:
+        return extractor.extraer_datos_pdf(pdf_path, tramos[0])
+
+    with ProcessPoolExecutor(max_workers=len(tramos)) as pool:
+        resultados = list(pool.map(_extraer_rango, [pdf_path] * len(tramos), tramos))
+
+    df_presupuesto = pd.concat([r[0] for r in resultados], ignore_index=True)
+    df_descripciones = pd.concat([r[1] for r in resultados], ignore_index=True)
+    return df_presupuesto, df_descripciones
+
+def escribir_parquet(ruta: Path, df: pd.DataFrame) -> None:
+    """Guarda el DataFrame en Parquet (pyarrow + zstd) con las columnas de texto como cadenas Arrow."""
+    columnas_texto = df.select_dtypes(include=['object', 'string']).columns
+    df = df.astype({col: pd.StringDtype('pyarrow') for col in columnas_texto})
+    df.to_parquet(ruta, engine='pyarrow', compression='zstd', index=False)
+
+def guardar_tablas(
+    excel_path: Path, formato: str, df_presupuesto: pd.DataFrame, df_descripciones: pd.DataFrame
+) -> List[Path]:
+    """Escribe las tablas extraídas en xlsx, Parquet o ambos y devuelve las rutas generadas."""
+    rutas = []
+    if formato in ('xlsx', 'both'):
+        escribir_excel(excel_path, {
+            'PRESUPUESTO': df_presupuesto,
+            'DESCRIPCIONES_COMPLETAS': df_descripciones
+        })
+        rutas.append(excel_path)
+
+    if formato in ('parquet', 'both'):
+        parquet_presupuesto = excel_path.with_suffix('.parquet')
+        parquet_descripciones = excel_path.with_name(f"{excel_path.stem}_descripciones.parquet")
+        escribir_parquet(parquet_presupuesto, df_presupuesto)
+        escribir_parquet(parquet_descripciones, df_descripciones)
+        rutas.extend([parquet_presupuesto, parquet_descripciones])
+
+    return rutas
+
+def escribir_json(ruta: Path, datos: Dict[str, Any]) -> None:
+    """
+    Guarda el análisis con orjson si está instalado, o con json estándar en su defecto.
+
+    El JSON se serializa completo en memoria y se vuelca con os.write en bloques
+    de 16 MB, en lugar de las muchas escrituras pequeñas de json.dump.
+    """
+    if orjson is not None:
+        contenido = orjson.dumps(datos, option=orjson.OPT_INDENT_2)
+    else:
+        contenido = json.dumps(datos, indent=2, ensure_ascii=False).encode('utf-8')
+
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(ruta, flags, 0o644)
+    try:
+        pendiente = memoryview(contenido)
+        while pendiente:
+            escritos = os.write(fd, pendiente[:_TAMANO_BLOQUE_ESCRITURA])
+            pendiente = pendiente[escritos:]
+    finally:
+        os.close(fd)
 
 def run(args):
     """Función principal que orquesta el proceso."""
-    logger.info(f"Iniciando proceso para el archivo: {args.archivo_pdf}")
+    pdf_path: Path = args.archivo_pdf
+    excel_path = args.salida_excel or pdf_path.with_suffix('.xlsx')
+    json_path = args.salida_analisis or pdf_path.with_suffix('.json')
+    logger.info("Iniciando proceso para el archivo: %s", pdf_path)
 
     try:
         # --- PASO 1: EXTRACCIÓN ---
-        extractor = ExtractorPDF()
+        extractor = _get_extractor()
         paginas = (args.inicio, args.fin if args.fin != 0 else 9999)
-        logger.info(f"Extrayendo datos de páginas {args.inicio} a {'final' if args.fin == 0 else args.fin}...")
+        logger.info("Extrayendo datos de páginas %s a %s...", args.inicio, 'final' if args.fin == 0 else args.fin)
 
-        df_presupuesto, df_descripciones = extractor.extraer_datos_pdf(str(args.archivo_pdf), paginas)
+        df_presupuesto, df_descripciones = extraer_en_paralelo(
+            extractor, str(pdf_path), paginas, args.workers
+        )
 
         if df_presupuesto.empty:
             logger.warning("No se extrajeron partidas del presupuesto. Finalizando.")
             return
 
-        excel_path = args.salida_excel or Path(args.archivo_pdf).with_suffix('.xlsx')
-        with pd.ExcelWriter(excel_path, engine='xlsxwriter') as writer:
-            df_presupuesto.to_excel(writer, sheet_name='PRESUPUESTO', index=False)
-            df_descripciones.to_excel(writer, sheet_name='DESCRIPCIONES_COMPLETAS', index=False)
-        logger.info(f"✅ Datos guardados en: {excel_path}")
+        # Pocas unidades distintas repetidas en miles de filas
+        df_presupuesto['UNIDAD'] = df_presupuesto['UNIDAD'].astype('category')
 
-        # --- PASO 2: ANÁLISIS NLP ---
-        analizador = AnalizadorNLP()
-        logger.info("Analizando descripciones con NLP...")
-        
-        # Usamos la función de conversión de tipos
-        datos_nlp = convertir_a_formato_nlp(df_descripciones)
-        resultados_nlp = analizador.analizar(datos_nlp)
-
-        json_path = args.salida_analisis or Path(args.archivo_pdf).with_suffix('.json')
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(resultados_nlp, f, indent=4, ensure_ascii=False)
-        logger.info(f"✅ Análisis NLP guardado en: {json_path}")
+        # Las tablas se escriben en segundo plano mientras corre el análisis NLP
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            futuro_tablas = pool.submit(
+                guardar_tablas, excel_path, args.formato, df_presupuesto, df_descripciones
+            )
+
+            # --- PASO 2: ANÁLISIS NLP ---
+            analizador = _get_analizador()
+            logger.info("Analizando descripciones con NLP...")
+            
+            # Usamos la función de conversión de tipos
+            datos_nlp = convertir_a_formato_nlp(df_descripciones)
+            resultados_nlp = analizador.analizar(datos_nlp)
+
+            for ruta in futuro_tablas.result():
+                logger.info("✅ Datos guardados en: %s", ruta)
+
+        escribir_json(json_path, resultados_nlp)
+        logger.info("✅ Análisis NLP guardado en: %s", json_path)
         
         print(f"\nProceso completado. Revisa los archivos de salida.")
 
     except Exception as e:
-        logger.error(f"Ocurrió un error crítico durante la ejecución: {e}", exc_info=True)
+        logger.error("Ocurrió un error crítico durante la ejecución: %s", e, exc_info=True)
         print(f"\n❌ Ocurrió un error. Revisa el archivo 'ejecucion_main.log' para más detalles.")
 
 if __name__ == "__main__":
+    _configurar_logging()
+
     parser = argparse.ArgumentParser(description="Extrae y analiza datos de presupuestos en PDF.")
     parser.add_argument("archivo_pdf", type=Path, help="Ruta al archivo PDF del presupuesto.")
     parser.add_argument("-i", "--inicio", type=int, default=1, help="Página inicial para la extracción.")
     parser.add_argument("-f", "--fin", type=int, default=0, help="Página final (0 para leer hasta el final).")
     parser.add_argument("-e", "--salida-excel", type=Path, help="Ruta para el archivo Excel de salida.")
     parser.add_argument("-a", "--salida-analisis", type=Path, help="Ruta para el archivo JSON del análisis.")
+    parser.add_argument("--formato", choices=["xlsx", "parquet", "both"], default="xlsx", help="Formato de las tablas extraídas (Parquet requiere pyarrow).")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Procesos para extraer el PDF en paralelo (1 para desactivarlo).")
 
     args = parser.parse_args()
 
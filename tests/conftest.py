@@ -0,0 +1,31 @@
+import pytest
+
+# Posición x de cada columna de una fila de presupuesto en el PDF generado
+_COLUMNAS_X = (40, 110, 300, 360, 430, 500)
+
+@pytest.fixture
+def crear_pdf(tmp_path):
+    """
+    Genera un PDF real con una tabla de partidas por página.
+
+    Cada página es una lista de filas; cada fila es una tupla de seis textos
+    (código, descripción, unidad, cantidad, precio, importe) que se colocan en
+    columnas separadas, como en los presupuestos maquetados en tabla.
+    """
+    import fitz
+
+    def _crear(paginas, nombre="presupuesto.pdf"):
+        ruta = tmp_path / nombre
+        doc = fitz.open()
+        for filas in paginas:
+            pagina = doc.new_page()
+            pagina.insert_text((40, 60), "PRESUPUESTO Y MEDICIONES")
+            for num_fila, fila in enumerate(filas):
+                y = 100 + 20 * num_fila
+                for x, texto in zip(_COLUMNAS_X, fila):
+                    pagina.insert_text((x, y), texto)
+        doc.save(str(ruta))
+        doc.close()
+        return str(ruta)
+
+    return _crear
@@ -0,0 +1,35 @@
+import logging
+from unittest.mock import patch
+from typer.testing import CliRunner
+from Core.cli import app
+
+runner = CliRunner()
+
+def test_procesar_error_de_extraccion_con_carga_fallida(crear_pdf, tmp_path, monkeypatch, caplog):
+    """Si fallan la extracción y la carga del modelo, se registran ambos errores y se sale con código 1."""
+    pdf_path = crear_pdf([[("01.02.03", "Cable de cobre", "UD", "10,00", "1.234,50", "12.345,00")]])
+    monkeypatch.chdir(tmp_path)
+
+    with patch('Core.cli.AnalizadorNLP', side_effect=RuntimeError("modelo no disponible")), \
+         patch('Core.cli.ExtractorPDF.extraer_datos_pdf', side_effect=ValueError("PDF dañado")), \
+         caplog.at_level(logging.ERROR):
+        resultado = runner.invoke(app, [pdf_path, "-e", str(tmp_path / "salida.xlsx")])
+
+    assert resultado.exit_code == 1
+    assert "PDF dañado" in caplog.text
+    assert "También falló la carga del modelo NLP: modelo no disponible" in caplog.text
+    assert not (tmp_path / "salida.xlsx").exists()
+
+def test_procesar_fallo_de_carga_no_se_duplica(crear_pdf, tmp_path, monkeypatch, caplog):
+    """Si solo falla la carga del modelo, el error se registra una vez."""
+    pdf_path = crear_pdf([[("01.02.03", "Cable de cobre", "UD", "10,00", "1.234,50", "12.345,00")]])
+    monkeypatch.chdir(tmp_path)
+
+    with patch('Core.cli.AnalizadorNLP', side_effect=RuntimeError("modelo no disponible")), \
+         caplog.at_level(logging.ERROR):
+        resultado = runner.invoke(app, [pdf_path, "-e", str(tmp_path / "salida.xlsx")])
+
+    assert resultado.exit_code == 1
+    assert "También falló" not in caplog.text
+    assert "modelo no disponible" in caplog.text
+    assert (tmp_path / "salida.xlsx").exists()
@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import pandas as pd
+from Core.extractor import ExtractorPDF
+
+@pytest.fixture
+def extractor():
+    """Proporciona un ExtractorPDF para las pruebas."""
+    return ExtractorPDF()
+
+def test_limpiar_y_convertir_numeros(extractor):
+    """Prueba la conversión de números con formato español."""
+    assert extractor._limpiar_y_convertir_numeros("1.234,56") == 1234.56
+    assert extractor._limpiar_y_convertir_numeros("100,00") == 100.0
+    assert extractor._limpiar_y_convertir_numeros("1,2,3") == 0.0
+    assert extractor._limpiar_y_convertir_numeros("") == 0.0
+
+def test_convertir_serie_numerica(extractor):
+    """Prueba la conversión vectorizada, que debe coincidir con la escalar."""
+    valores = ["1.234,56", "100,00", "1,2,3", "7"]
+    resultado = extractor._convertir_serie_numerica(pd.Series(valores, dtype=str))
+    assert resultado.tolist() == [extractor._limpiar_y_convertir_numeros(v) for v in valores]
+
+def test_extraer_partidas_cantidades_enteras(extractor):
+    """Sin coma decimal en ninguna cantidad las columnas deben seguir siendo float."""
+    partidas = extractor._extraer_partidas([
+        "01.02.03 Cable de cobre UD 10 1.234,50 12.345,00",
+        "01.02.04 Borna UD 2 50,00 100,00",
+    ])
+    assert partidas["CANTIDAD"].dtype == "float64"
+
+    df = extractor._validar_datos(partidas)
+    assert df["CANTIDAD"].tolist() == [10, 2]
+
+def test_procesar_linea(extractor):
+    """Prueba el procesado de una línea suelta."""
+    datos = extractor._procesar_linea("  01.02.03 Cable de cobre UD 10,00 1.234,50 12.345,00  ")
+    assert datos["CÓDIGO"] == "01.02.03"
+    assert datos["DESCRIPCIÓN"] == "Cable de cobre"
+    assert datos["IMPORTE_TOTAL"] == 12345.0
+    assert extractor._procesar_linea("Capítulo 01 Instalaciones") is None
+
+@patch('Core.extractor.fitz.open')
+def test_extraer_datos_pdf_con_mock(mock_fitz_open, extractor):
+    """
+    Prueba extraer_datos_pdf simulando las páginas del PDF.
+    """
+    texto_pagina = """CAPÍTULO 01 INSTALACIONES
+    01.02.03 Cable de cobre UD 10,00 1.234,50 12.345,00
+    01.02.04 Contactor 4x25A UD 2 50,00 100,00
+    Suma y sigue
+    """
+    # get_text("words"): (x0, y0, x1, y1, palabra, bloque, línea, número de palabra)
+    palabras = [
+        (10.0 * num_palabra, 12.0 * num_linea, 10.0 * num_palabra + 8, 12.0 * num_linea + 10, palabra, 0, num_linea, num_palabra)
+        for num_linea, linea in enumerate(texto_pagina.splitlines())
+        for num_palabra, palabra in enumerate(linea.split())
+    ]
+    mock_pagina = MagicMock()
+    mock_pagina.get_text.return_value = palabras
+    mock_doc = MagicMock()
+    mock_doc.page_count = 1
+    mock_doc.__getitem__.return_value = mock_pagina
+    mock_fitz_open.return_value.__enter__.return_value = mock_doc
+
+    # El rango abierto de la CLI (9999) se ajusta al número real de páginas
+    df_presupuesto, df_descripciones = extractor.extraer_datos_pdf("dummy.pdf", (1, 9999))
+
+    assert isinstance(df_presupuesto, pd.DataFrame)
+    assert len(df_presupuesto) == 2
+    mock_doc.__getitem__.assert_called_once_with(0)
+
+    fila_uno = df_presupuesto.iloc[0]
+    assert fila_uno['CÓDIGO'] == '01.02.03'
+    assert fila_uno['UNIDAD'] == 'UD'
+    assert fila_uno['CANTIDAD'] == 10
+    assert fila_uno['PRECIO_UNITARIO'] == 1234.5
+
+    assert df_descripciones['DESCRIPCIÓN_COMPLETA'].tolist() == [
+        '01.02.03 Cable de cobre',
+        '01.02.04 Contactor 4x25A',
+    ]
+
+def test_extraer_datos_pdf_tabla(extractor, crear_pdf):
+    """
+    Prueba extraer_datos_pdf sobre un PDF real con las columnas en posiciones separadas.
+    """
+    pdf_path = crear_pdf([[
+        ("01.02.03", "Cable de cobre", "UD", "10,00", "1.234,50", "12.345,00"),
+        ("01.02.04", "Borna", "UD", "2", "50,00", "100,00"),
+    ]])
+
+    df_presupuesto, df_descripciones = extractor.extraer_datos_pdf(pdf_path, (1, 0))
+
+    assert df_presupuesto['CÓDIGO'].tolist() == ['01.02.03', '01.02.04']
+    assert df_presupuesto['DESCRIPCIÓN'].tolist() == ['Cable de cobre', 'Borna']
+    assert df_presupuesto['IMPORTE_TOTAL'].tolist() == [12345.0, 100.0]
+    assert df_descripciones['DESCRIPCIÓN_COMPLETA'].iloc[0] == '01.02.03 Cable de cobre'
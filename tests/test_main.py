@@ -0,0 +1,165 @@
+import os
+import json
+import pytest
+from unittest.mock import patch
+import pandas as pd
+import main
+from Core.extractor import ExtractorPDF
+from Core.salida import escribir_excel
+from main import _dividir_rango, extraer_en_paralelo, escribir_json, guardar_tablas
+
+def _paginas_presupuesto(num_paginas):
+    """Dos partidas por página con códigos correlativos."""
+    return [
+        [
+            (f"01.{pagina:02d}.01", f"Cable página {pagina}", "ML", "10,50", "2,00", "21,00"),
+            (f"01.{pagina:02d}.02", f"Borna página {pagina}", "UD", "3", "1,50", "4,50"),
+        ]
+        for pagina in range(1, num_paginas + 1)
+    ]
+
+def _tablas_extraidas():
+    """Tablas con la forma que devuelve ExtractorPDF, con UNIDAD categórica como en run()."""
+    df_presupuesto = pd.DataFrame({
+        'CÓDIGO': ['01.01.01', '01.01.02', '01.01.03'],
+        'DESCRIPCIÓN': ['Cable de cobre', 'Borna', 'Contactor 4x25A'],
+        'UNIDAD': pd.Categorical(['ML', 'UD', 'UD']),
+        'CANTIDAD': [10.5, 2.0, 3.0],
+        'PRECIO_UNITARIO': [2.0, 1.5, 40.0],
+        'IMPORTE_TOTAL': [21.0, 3.0, 120.0],
+    })
+    df_descripciones = pd.DataFrame({
+        'CÓDIGO': df_presupuesto['CÓDIGO'],
+        'DESCRIPCIÓN_COMPLETA': df_presupuesto['CÓDIGO'] + ' ' + df_presupuesto['DESCRIPCIÓN'],
+        'UNIDAD': df_presupuesto['UNIDAD'],
+    })
+    return df_presupuesto, df_descripciones
+
+@pytest.mark.parametrize("inicio, fin, workers, esperado", [
+    (1, 10, 3, [(1, 4), (5, 7), (8, 10)]),
+    (1, 2, 8, [(1, 1), (2, 2)]),
+    (3, 3, 4, [(3, 3)]),
+    (1, 5, 1, [(1, 5)]),
+    (6, 5, 4, [(6, 5)]),
+])
+def test_dividir_rango(inicio, fin, workers, esperado):
+    """Prueba el reparto de páginas en tramos contiguos."""
+    assert _dividir_rango(inicio, fin, workers) == esperado
+
+def test_extraer_en_paralelo_mismo_resultado(crear_pdf):
+    """Con uno o varios procesos se obtienen las mismas filas en el mismo orden."""
+    pdf_path = crear_pdf(_paginas_presupuesto(5))
+    extractor = ExtractorPDF()
+
+    # El rango abierto (9999) se ajusta al número real de páginas
+    serie = extraer_en_paralelo(extractor, pdf_path, (1, 9999), 1)
+    paralelo = extraer_en_paralelo(extractor, pdf_path, (1, 9999), 3)
+
+    assert len(serie[0]) == 10
+    assert serie[0]['CÓDIGO'].tolist()[:3] == ['01.01.01', '01.01.02', '01.02.01']
+    pd.testing.assert_frame_equal(serie[0], paralelo[0])
+    pd.testing.assert_frame_equal(serie[1], paralelo[1])
+
+@patch('main.ProcessPoolExecutor')
+def test_extraer_en_paralelo_un_proceso(mock_pool, crear_pdf):
+    """Con un único tramo se extrae en el propio proceso, sin crear el pool."""
+    pdf_path = crear_pdf(_paginas_presupuesto(2))
+
+    df_presupuesto, _ = extraer_en_paralelo(ExtractorPDF(), pdf_path, (1, 9999), 1)
+
+    assert len(df_presupuesto) == 4
+    mock_pool.assert_not_called()
+
+def test_extraer_en_paralelo_inicio_fuera_de_rango(crear_pdf):
+    """Si la página inicial supera el número de páginas no se extrae nada."""
+    pdf_path = crear_pdf(_paginas_presupuesto(3))
+
+    df_presupuesto, df_descripciones = extraer_en_paralelo(ExtractorPDF(), pdf_path, (10, 9999), 4)
+
+    assert df_presupuesto.empty
+    assert df_descripciones.empty
+
+def test_escribir_excel_ida_y_vuelta(tmp_path):
+    """Las dos hojas se leen de vuelta con todas sus cabeceras, filas y la UNIDAD categórica."""
+    df_presupuesto, df_descripciones = _tablas_extraidas()
+    ruta = tmp_path / "presupuesto.xlsx"
+
+    escribir_excel(ruta, {
+        'PRESUPUESTO': df_presupuesto,
+        'DESCRIPCIONES_COMPLETAS': df_descripciones
+    })
+    hojas = pd.read_excel(ruta, sheet_name=None)
+
+    assert list(hojas) == ['PRESUPUESTO', 'DESCRIPCIONES_COMPLETAS']
+    for nombre, df in (('PRESUPUESTO', df_presupuesto), ('DESCRIPCIONES_COMPLETAS', df_descripciones)):
+        leido = hojas[nombre]
+        assert list(leido.columns) == list(df.columns)
+        assert leido.values.tolist() == df.astype({'UNIDAD': str}).values.tolist()
+    assert hojas['PRESUPUESTO']['UNIDAD'].tolist() == ['ML', 'UD', 'UD']
+
+_ANALISIS = {
+    "conteo_materiales": {"cable": 2, "protección": 1},
+    "normativas_encontradas": ["REBT", "UNE-EN"],
+    "alertas_tecnicas": [
+        {"código": "01.01.03", "mensaje": "Se menciona 'contactor' sin parámetro técnico (ej: 4x25A)."}
+    ],
+}
+
+@pytest.mark.parametrize("con_orjson", [False, True])
+def test_escribir_json_por_bloques(tmp_path, monkeypatch, con_orjson):
+    """Con bloques de pocos bytes el fichero coincide con json.dumps, con orjson o sin él."""
+    if con_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(main, "orjson", None)
+    monkeypatch.setattr(main, "_TAMANO_BLOQUE_ESCRITURA", 7)
+    ruta = tmp_path / "analisis.json"
+
+    escribir_json(ruta, _ANALISIS)
+
+    assert ruta.read_bytes() == json.dumps(_ANALISIS, indent=2, ensure_ascii=False).encode('utf-8')
+
+def test_escribir_json_escrituras_parciales(tmp_path, monkeypatch):
+    """Si os.write escribe menos de lo pedido se reintenta con lo pendiente."""
+    escribir = os.write
+    monkeypatch.setattr(main.os, "write", lambda fd, datos: escribir(fd, datos[:3]))
+    ruta = tmp_path / "analisis.json"
+
+    escribir_json(ruta, _ANALISIS)
+
+    assert json.loads(ruta.read_text(encoding='utf-8')) == _ANALISIS
+
+def test_guardar_tablas_ambos_formatos(tmp_path):
+    """Con 'both' se generan el xlsx y un Parquet por tabla, con cadenas Arrow y UNIDAD como diccionario."""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    df_presupuesto, df_descripciones = _tablas_extraidas()
+    excel_path = tmp_path / "presupuesto.xlsx"
+
+    rutas = guardar_tablas(excel_path, 'both', df_presupuesto, df_descripciones)
+
+    parquet_presupuesto = tmp_path / "presupuesto.parquet"
+    parquet_descripciones = tmp_path / "presupuesto_descripciones.parquet"
+    assert rutas == [excel_path, parquet_presupuesto, parquet_descripciones]
+    assert all(ruta.exists() for ruta in rutas)
+
+    for ruta, df in ((parquet_presupuesto, df_presupuesto), (parquet_descripciones, df_descripciones)):
+        leido = pd.read_parquet(ruta)
+        assert list(leido.columns) == list(df.columns)
+        assert leido.astype(object).values.tolist() == df.astype(object).values.tolist()
+        assert leido['CÓDIGO'].dtype == pd.StringDtype('pyarrow')
+        assert isinstance(leido['UNIDAD'].dtype, pd.CategoricalDtype)
+
+        esquema = pq.read_schema(ruta)
+        assert pa.types.is_large_string(esquema.field('CÓDIGO').type)
+        assert pa.types.is_dictionary(esquema.field('UNIDAD').type)
+
+def test_guardar_tablas_solo_parquet(tmp_path):
+    """Con 'parquet' no se escribe el xlsx."""
+    pytest.importorskip("pyarrow")
+    excel_path = tmp_path / "presupuesto.xlsx"
+
+    rutas = guardar_tablas(excel_path, 'parquet', *_tablas_extraidas())
+
+    assert rutas == [tmp_path / "presupuesto.parquet", tmp_path / "presupuesto_descripciones.parquet"]
+    assert not excel_path.exists()
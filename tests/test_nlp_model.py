@@ -0,0 +1,95 @@
+import pytest
+import spacy
+from spacy.language import Language
+from Core.nlp_model import AnalizadorNLP
+
+@pytest.fixture
+def analizador():
+    """Proporciona un AnalizadorNLP sobre un pipeline vacío, sin descargar modelos."""
+    return AnalizadorNLP(nlp=spacy.blank("es"))
+
+def _partidas(*descripciones):
+    return {"partidas": [
+        {"codigo": f"01.01.{i:02d}", "descripcion": descripcion}
+        for i, descripcion in enumerate(descripciones, start=1)
+    ]}
+
+def test_analizar_materiales_y_normativas(analizador):
+    """Prueba el conteo de materiales y la recogida de normativas."""
+    resultado = analizador.analizar(_partidas(
+        "cable de cobre según REBT",
+        "cable y bornas conforme a UNE-EN e IEC",
+    ))
+    assert resultado["conteo_materiales"] == {"cable": 2, "bornas": 1}
+    assert resultado["normativas_encontradas"] == ["IEC", "REBT", "UNE-EN"]
+    assert resultado["alertas_tecnicas"] == []
+
+@pytest.mark.parametrize("descripcion", [
+    "Contactor modular",
+    "Telecontactor modular",
+    "contactor-inversor de cable",
+    "Suministro de contactores",
+])
+def test_alerta_contactor_sin_parametro(analizador, descripcion):
+    """Cualquier mención de 'contactor' sin parámetro genera una alerta."""
+    resultado = analizador.analizar(_partidas(descripcion))
+    assert [alerta["código"] for alerta in resultado["alertas_tecnicas"]] == ["01.01.01"]
+
+def test_contactor_con_parametro_sin_alerta(analizador):
+    """Un parámetro como 4x25A evita la alerta."""
+    resultado = analizador.analizar(_partidas("contactor 4x25A"))
+    assert resultado["alertas_tecnicas"] == []
+    assert resultado["conteo_materiales"] == {"contactor": 1}
+
+def test_analizar_ignora_partidas_invalidas(analizador):
+    """Las partidas mal formadas o sin descripción se ignoran."""
+    datos = {"partidas": ["no es un dict", {"codigo": "01"}, {"codigo": "02", "descripcion": "cable"}]}
+    assert analizador.analizar(datos)["conteo_materiales"] == {"cable": 1}
+
+def test_analizar_entrada_invalida(analizador):
+    """Prueba que una entrada sin lista de partidas lanza ValueError."""
+    with pytest.raises(ValueError):
+        analizador.analizar({"partidas": "cable"})
+
+def test_entity_ruler_compartido_sin_duplicados():
+    """Varias instancias sobre el mismo pipeline no duplican los patrones."""
+    nlp = spacy.blank("es")
+    AnalizadorNLP(nlp=nlp)
+    num_patrones = len(nlp.get_pipe("presupuestos_ruler").patterns)
+
+    analizador = AnalizadorNLP(nlp=nlp)
+
+    assert len(nlp.get_pipe("presupuestos_ruler").patterns) == num_patrones
+    assert analizador.analizar(_partidas("cable"))["conteo_materiales"] == {"cable": 1}
+
+@Language.component("falla_con_error")
+def _falla_con_error(doc):
+    """Componente de prueba que falla con las descripciones que contienen 'ERROR'."""
+    if "ERROR" in doc.text:
+        raise ValueError("fallo simulado en el pipeline")
+    return doc
+
+def test_analizar_fallo_en_pipeline(analizador):
+    """Un fallo dentro de nlp.pipe solo descarta la partida afectada."""
+    analizador.nlp.add_pipe("falla_con_error", first=True)
+
+    resultado = analizador.analizar(_partidas("cable", "ERROR", "bornas", "contactor"))
+
+    assert resultado["conteo_materiales"] == {"cable": 1, "bornas": 1, "contactor": 1}
+    assert [alerta["código"] for alerta in resultado["alertas_tecnicas"]] == ["01.01.04"]
+
+@pytest.mark.parametrize("valor, esperado", [
+    (None, 64),
+    ("16", 16),
+    ("abc", 64),
+    ("0", 64),
+    ("-8", 64),
+])
+def test_tamano_lote(analizador, monkeypatch, valor, esperado):
+    """NLP_BATCH_SIZE se lee al analizar y los valores inválidos vuelven al valor por defecto."""
+    if valor is None:
+        monkeypatch.delenv("NLP_BATCH_SIZE", raising=False)
+    else:
+        monkeypatch.setenv("NLP_BATCH_SIZE", valor)
+    assert analizador._tamano_lote() == esperado
+    assert analizador.analizar(_partidas("cable"))["conteo_materiales"] == {"cable": 1}